@@ -0,0 +1,29 @@
+"""
+Optionaler Build: kompiliert url_to_standalone.py mit mypyc zu einer C-Extension
+(CSS-Inlining, Data-URLs, Regex-Pfad laufen dann ohne Interpreter-Overhead).
+
+    pip install mypy wheel
+    pip install --no-build-isolation .
+
+Die kompilierte Extension nutzt nur der installierte Befehl url-to-standalone
+(bzw. ein import url_to_standalone) - "python url_to_standalone.py" führt
+immer den Quelltext aus. Ohne mypyc bzw. ohne Build läuft das Modul
+unverändert als reines Python.
+"""
+
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+    # Optionale Abhängigkeiten (Playwright, HTTP-Clients, pybase64 ...) bringen
+    # teils keine Typ-Stubs mit - sie bleiben für mypyc einfach Any
+    ext_modules = mypycify(['--ignore-missing-imports', 'url_to_standalone.py'])
+except ImportError:
+    ext_modules = []
+
+setup(
+    name='url-to-standalone',
+    py_modules=['url_to_standalone'],
+    ext_modules=ext_modules,
+    entry_points={'console_scripts': ['url-to-standalone=url_to_standalone:main']},
+)
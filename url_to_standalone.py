@@ -6,7 +6,7 @@ Lädt eine Webseite und erstellt eine vollständig selbstständige HTML-Datei
 die offline funktioniert - alle Ressourcen (CSS, Bilder, Fonts) werden eingebettet.
 
 Usage:
-    python url_to_standalone.py <url> [output.html] [--assets-mode embed|download|hotlink]
+    python url_to_standalone.py <url> [output.html] [--assets-mode embed|download|hotlink|mhtml]
 
 Beispiele:
     python url_to_standalone.py https://example.com
@@ -16,30 +16,86 @@ Beispiele:
 Requires:
     pip install playwright requests
     playwright install chromium
+
+Optional:
+    pip install aiohttp     # paralleles Laden der Ressourcen
+    pip install httpx[http2]  # Alternative zu aiohttp: HTTP/2-Multiplexing
+    pip install pybase64    # SIMD-beschleunigtes Base64 für den embed-Modus
+    pip install selectolax  # HTML einmal parsen statt mehrerer Regex-Durchläufe
+    pip install zlib-ng     # schnelleres gzip für --compress gz
+    pip install brotli      # für --compress br
+    pip install uvloop      # schnellerer Event-Loop (nicht unter Windows)
 """
 
 import argparse
 import asyncio
 import base64
+import gzip
+import hashlib
+import json
+import os
 import re
+import stat
+import string
 import sys
+import threading
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, quote
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from email import encoders, policy
+from email.charset import Charset, QP
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.nonmultipart import MIMENonMultipart
+from email.utils import formatdate
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Set, Tuple
+
+# Playwright und die HTTP-Clients sind teuer zu importieren - hier wird nur geprüft,
+# ob sie installiert sind; importiert wird erst bei Bedarf (--help startet sofort)
+PLAYWRIGHT_AVAILABLE = find_spec('playwright') is not None
+REQUESTS_AVAILABLE = find_spec('requests') is not None
+AIOHTTP_AVAILABLE = find_spec('aiohttp') is not None
+HTTPX_AVAILABLE = find_spec('httpx') is not None
+# Nur für httpx(http2=True) benötigt
+HTTP2_AVAILABLE = find_spec('h2') is not None
+
+if TYPE_CHECKING:
+    # Nur für die Typannotationen (mypy/mypyc) - zur Laufzeit bleibt es beim Lazy-Import
+    import aiohttp
+    import httpx
+    import requests
 
 try:
-    from playwright.async_api import async_playwright
-    PLAYWRIGHT_AVAILABLE = True
+    import pybase64
+    PYBASE64_AVAILABLE = True
 except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+    PYBASE64_AVAILABLE = False
 
 try:
-    import requests
-    REQUESTS_AVAILABLE = True
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from zlib_ng import gzip_ng
+    ZLIB_NG_AVAILABLE = True
+except ImportError:
+    ZLIB_NG_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
 except ImportError:
-    REQUESTS_AVAILABLE = False
+    UVLOOP_AVAILABLE = False
 
 
 # Wasserzeichen CSS + HTML
@@ -87,91 +143,632 @@ html, body {{ overflow: auto !important; overflow-x: hidden !important; height:
 <div class="preview-watermark-corner">⚠️ Vorschau</div>
 """
 
+SCROLL_FIX_CSS = '<style id="standalone-scroll-fix">html, body { overflow: auto !important; overflow-x: hidden !important; height: auto !important; max-height: none !important; position: static !important; }</style>'
+
+META_COMMENT = """<!--
+╔══════════════════════════════════════════════════════════════════════════╗
+║  STANDALONE HTML PREVIEW                                                  ║
+╠══════════════════════════════════════════════════════════════════════════╣
+║  Projekt:  {project_name:<62} ║
+║  Erstellt: {created:<62} ║
+║  Quelle:   {domain:<62} ║
+╠══════════════════════════════════════════════════════════════════════════╣
+║  Diese Datei funktioniert offline und enthält alle eingebetteten         ║
+║  Ressourcen. Sie dient nur zur Vorschau - nicht für Produktion.          ║
+╚══════════════════════════════════════════════════════════════════════════╝
+-->
+"""
+
+
+# Vorkompilierte Patterns (einmal beim Import statt bei jedem Aufruf)
+# <noscript> wird ohne Scripts nie angezeigt (JS ist im Viewer aktiv) - mit entfernen
+_SCRIPT_OPEN_RE = re.compile(r'<(script|noscript)\b', re.IGNORECASE)
+_SCRIPT_CLOSE_RES = {
+    'script': re.compile(r'</script>', re.IGNORECASE),
+    'noscript': re.compile(r'</noscript>', re.IGNORECASE),
+}
+_EVENT_HANDLER_RE = re.compile(r"""\s+on\w+=(?:"[^"]*"|'[^']*')""", re.IGNORECASE)
+
+LAZY_ATTRS = ['data-src', 'data-lazy-src', 'data-original', 'data-lazy', 'data-iesrc']
+# Für img und picture Tags ohne src oder mit Placeholder-src - alle Attribute in einem Durchlauf
+_LAZY_RE = re.compile(
+    r'(<(?:img|picture)[^>]*?)(?:\s+src=["\'][^"\']*["\'])?\s+'
+    rf'(?:{"|".join(map(re.escape, LAZY_ATTRS))})=["\']([^"\']+)["\']([^>]*>)',
+    re.IGNORECASE
+)
+_LAZY_SRCSET_RE = re.compile(r'(<(?:img|source)[^>]*?)\s+data-srcset=["\']([^"\']+)["\']', re.IGNORECASE)
+_LOADING_LAZY_RE = re.compile(r'\s+loading=["\']lazy["\']', re.IGNORECASE)
+
+# rel=stylesheet vor/nach href oder .css-Link - die erste gesetzte Gruppe ist die href
+_STYLESHEET_RE = re.compile(
+    r'<link[^>]+(?:'
+    r'rel=["\']stylesheet["\'][^>]+href=["\']([^"\']+)["\']'
+    r'|href=["\']([^"\']+)["\'][^>]+rel=["\']stylesheet["\']'
+    r'|href=["\']([^"\']+\.css[^"\']*)["\']'
+    r')[^>]*>',
+    re.IGNORECASE
+)
+_STYLE_URL_PATTERN = r'(?P<style_prefix>style=["\'][^"\']*url\(["\']?)(?P<style_url>[^"\')\s]+)(?P<style_suffix>["\']?\)[^"\']*["\'])'
+# Ein Durchlauf für alle Asset-Referenzen: img/picture/source-Tags komplett, sonst style-Attribute
+_ASSET_RE = re.compile(r'<(?P<tag>img|picture|source)\b[^>]*>|' + _STYLE_URL_PATTERN, re.IGNORECASE)
+# Attribute innerhalb eines bereits gefundenen Tags
+_SRC_ATTR_RE = re.compile(r'(\ssrc=)(["\'])([^"\']+)(\2)', re.IGNORECASE)
+_SRCSET_RE = re.compile(r'srcset=["\']([^"\']+)["\']', re.IGNORECASE)
+_STYLE_URL_RE = re.compile(_STYLE_URL_PATTERN, re.IGNORECASE)
+# url() in CSS - aber vorsichtig mit CSS-Escapes wie \e oder \f
+_CSS_URL_RE = re.compile(r'url\(\s*["\']?([^"\'()\s\\]+(?:\\.[^"\'()\s\\]*)*)["\']?\s*\)')
+
+_XML_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# CSS-Selektoren für den selectolax-Pfad (Sammeln und Ersetzen nutzen dieselben)
+SCRIPT_SELECTOR = 'script, noscript'
+STYLESHEET_LINK_SELECTOR = 'link[href]'
+IMG_SRC_SELECTOR = 'img[src], picture[src]'
+SRCSET_SELECTOR = '[srcset]'
+STYLE_ATTR_SELECTOR = '[style]'
+REPLACEMENT_SELECTOR = 'style, link'
+
+
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+def create_requests_session() -> 'requests.Session':
+    """Erstellt eine requests-Session mit Connection-Pool (Keep-Alive) und Retries."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update(FETCH_HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Eine Session für alle Ressourcen - Verbindungen zum selben Host werden wiederverwendet.
+# Sie wird beim ersten Download angelegt (fetch_resource läuft auch in Worker-Threads)
+_SESSION: Optional['requests.Session'] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_requests_session() -> 'requests.Session':
+    """Gibt die gemeinsame requests-Session zurück (legt sie beim ersten Aufruf an)."""
+    global _SESSION
+    # Über eine lokale Variable prüfen: mypyc vertraut der Typ-Eingrenzung, ein
+    # erneutes "_SESSION is None" unter dem Lock sähe sonst immer den Typ None
+    session = _SESSION
+    if session is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = create_requests_session()
+            session = _SESSION
+    return session
+
 
 def fetch_resource(url: str, timeout: int = 15) -> tuple:
     """Lädt eine externe Ressource herunter."""
     if not REQUESTS_AVAILABLE:
         return (url, None, "requests nicht installiert")
     try:
-        response = requests.get(url, timeout=timeout, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }, verify=True)
+        response = get_requests_session().get(url, timeout=timeout, verify=True)
         response.raise_for_status()
         return (url, response.content, response.headers.get('Content-Type', ''))
     except Exception as e:
         return (url, None, str(e))
 
 
+async def fetch_resource_async(session, url: str, semaphore: asyncio.Semaphore, timeout: int = 15) -> tuple:
+    """Lädt eine externe Ressource über eine aiohttp-Session herunter."""
+    import aiohttp
+
+    async with semaphore:
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                content = await response.read()
+                return (url, content, response.headers.get('Content-Type', ''))
+        except Exception as e:
+            return (url, None, str(e))
+
+
+def create_client_session() -> 'aiohttp.ClientSession':
+    """Erstellt eine aiohttp-Session mit Connection-Pool (Keep-Alive, DNS-Cache)."""
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=64,
+        limit_per_host=16,
+        ttl_dns_cache=300,
+        keepalive_timeout=30
+    )
+    return aiohttp.ClientSession(headers=FETCH_HEADERS, connector=connector)
+
+
+async def fetch_resource_httpx(client, url: str, semaphore: asyncio.Semaphore) -> tuple:
+    """Lädt eine externe Ressource über einen httpx-Client herunter."""
+    async with semaphore:
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+            return (url, response.content, response.headers.get('Content-Type', ''))
+        except Exception as e:
+            return (url, None, str(e))
+
+
+def create_httpx_client(max_connections: Optional[int], timeout: int = 15) -> 'httpx.AsyncClient':
+    """
+    Erstellt einen httpx-Client - mit HTTP/2 laufen alle Requests an einen Host über eine Verbindung.
+    max_connections=None: keine Obergrenze (begrenzt wird über die Semaphore in fetch_resources).
+    """
+    import httpx
+
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        headers=FETCH_HEADERS,
+        timeout=timeout,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=max_connections)
+    )
+
+
+def is_httpx_client(session) -> bool:
+    """True für einen httpx-Client (ohne httpx dafür importieren zu müssen)."""
+    return type(session).__module__.split('.', 1)[0] == 'httpx'
+
+
+def create_fetch_session(max_connections: Optional[int] = None):
+    """
+    Öffnet die Session für fetch_resources, die über mehrere Aufrufe (HTML-Referenzen,
+    CSS-url()-Ziele, weitere Seiten) geteilt wird: aiohttp falls installiert, sonst
+    httpx. Gibt None zurück, wenn nur requests verfügbar ist.
+    """
+    if AIOHTTP_AVAILABLE:
+        return create_client_session()
+    if HTTPX_AVAILABLE:
+        return create_httpx_client(max_connections)
+    return None
+
+
+async def close_fetch_session(session):
+    """Schließt eine mit create_fetch_session geöffnete Session."""
+    if is_httpx_client(session):
+        await session.aclose()
+    else:
+        await session.close()
+
+
+# Maximal gleichzeitige Downloads (--concurrency)
+DEFAULT_CONCURRENCY = 16
+
+
+async def fetch_resources(urls, max_workers: int = DEFAULT_CONCURRENCY, session=None) -> Dict[str, tuple]:
+    """
+    Lädt mehrere Ressourcen parallel herunter.
+
+    Nutzt aiohttp (falls installiert), sonst httpx (HTTP/2), sonst requests
+    in einem Thread-Pool.
+
+    Args:
+        max_workers: Obergrenze für gleichzeitige Downloads
+        session: Optionale aiohttp-Session bzw. httpx-Client, der wiederverwendet
+            wird (siehe create_fetch_session; sonst wird für diesen Aufruf eine
+            eigene Session geöffnet)
+
+    Returns:
+        Dict url -> (content, content_type); bei Fehlern ist content None
+        und content_type enthält die Fehlermeldung.
+    """
+    if not urls:
+        return {}
+    urls = list(urls)
+
+    if session is not None and is_httpx_client(session):
+        semaphore = asyncio.Semaphore(max_workers)
+        results = await asyncio.gather(
+            *(fetch_resource_httpx(session, url, semaphore) for url in urls),
+            return_exceptions=True
+        )
+    elif AIOHTTP_AVAILABLE:
+        # Begrenzt die gleichzeitigen Requests - zu viele parallele TLS-Handshakes bremsen
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch_all(client_session):
+            return await asyncio.gather(
+                *(fetch_resource_async(client_session, url, semaphore) for url in urls),
+                return_exceptions=True
+            )
+
+        if session is not None:
+            results = await fetch_all(session)
+        else:
+            async with create_client_session() as own_session:
+                results = await fetch_all(own_session)
+    elif HTTPX_AVAILABLE:
+        semaphore = asyncio.Semaphore(max_workers)
+        async with create_httpx_client(max_workers) as client:
+            results = await asyncio.gather(
+                *(fetch_resource_httpx(client, url, semaphore) for url in urls),
+                return_exceptions=True
+            )
+    else:
+        # requests ist synchron - nur dieser Fallback braucht Threads
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, fetch_resource, url) for url in urls),
+                return_exceptions=True
+            )
+
+    # Ein fehlgeschlagener Download darf die übrigen nicht abbrechen
+    return {
+        url: (None, str(result)) if isinstance(result, BaseException) else result[1:]
+        for url, result in zip(urls, results)
+    }
+
+
+# Dateiendung -> MIME-Type (ein Dict-Lookup statt einer if-Kette)
+_EXT_MIME = {
+    'css': 'text/css',
+    'js': 'application/javascript',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'svg': 'image/svg+xml',
+    'webp': 'image/webp',
+    'ico': 'image/x-icon',
+    'woff2': 'font/woff2',
+    'woff': 'font/woff',
+    'ttf': 'font/ttf',
+    'eot': 'application/vnd.ms-fontobject',
+}
+# Fallback über den Content-Type Header - Reihenfolge beachten (woff2 vor woff)
+_CT_MIME = (
+    ('css', 'text/css'),
+    ('javascript', 'application/javascript'),
+    ('png', 'image/png'),
+    ('jpeg', 'image/jpeg'),
+    ('gif', 'image/gif'),
+    ('svg', 'image/svg+xml'),
+    ('webp', 'image/webp'),
+    ('ico', 'image/x-icon'),
+    ('woff2', 'font/woff2'),
+    ('woff', 'font/woff'),
+    ('ttf', 'font/ttf'),
+    ('eot', 'application/vnd.ms-fontobject'),
+)
+
+
+# "data:<mime>;base64," für bekannte Typen vorberechnet (feste Menge, wächst nicht)
+_BASE64_PREFIXES = {
+    mime: f'data:{mime};base64,' for mime in (*_EXT_MIME.values(), 'application/octet-stream')
+}
+
+
 def get_mime_type(url: str, content_type: str = '') -> str:
     """Ermittelt MIME-Type basierend auf URL oder Content-Type Header."""
-    url_lower = url.lower()
-    content_type_lower = content_type.lower() if content_type else ''
-    
-    if 'css' in content_type_lower or url_lower.endswith('.css'):
-        return 'text/css'
-    if 'javascript' in content_type_lower or url_lower.endswith('.js'):
-        return 'application/javascript'
-    if 'png' in content_type_lower or url_lower.endswith('.png'):
-        return 'image/png'
-    if 'jpeg' in content_type_lower or '.jpg' in url_lower or '.jpeg' in url_lower:
-        return 'image/jpeg'
-    if 'gif' in content_type_lower or url_lower.endswith('.gif'):
-        return 'image/gif'
-    if 'svg' in content_type_lower or url_lower.endswith('.svg'):
-        return 'image/svg+xml'
-    if 'webp' in content_type_lower or url_lower.endswith('.webp'):
-        return 'image/webp'
-    if 'ico' in content_type_lower or url_lower.endswith('.ico'):
-        return 'image/x-icon'
-    if 'woff2' in content_type_lower or url_lower.endswith('.woff2'):
-        return 'font/woff2'
-    if 'woff' in content_type_lower or url_lower.endswith('.woff'):
-        return 'font/woff'
-    if 'ttf' in content_type_lower or url_lower.endswith('.ttf'):
-        return 'font/ttf'
-    if 'eot' in content_type_lower or url_lower.endswith('.eot'):
-        return 'application/vnd.ms-fontobject'
+    path = url.split('?', 1)[0].split('#', 1)[0]
+    mime = _EXT_MIME.get(path.rsplit('.', 1)[-1].lower())
+    if mime:
+        return mime
+
+    if content_type:
+        content_type_lower = content_type.lower()
+        for needle, mime in _CT_MIME:
+            if needle in content_type_lower:
+                return mime
     return content_type or 'application/octet-stream'
 
 
-def inline_css_resources(css_content: str, base_url: str) -> str:
-    """Findet url() Referenzen in CSS und bettet sie als Base64 ein."""
-    # Pattern für url() - aber vorsichtig mit CSS-Escapes wie \e oder \f
-    url_pattern = r'url\(\s*["\']?([^"\'()\s\\]+(?:\\.[^"\'()\s\\]*)*)["\']?\s*\)'
-    
+def strip_scripts(html: str) -> str:
+    """Entfernt <script>- und <noscript>-Blöcke und Inline-Event-Handler (onclick etc.)."""
+    # Linearer Scan statt verschachtelter Regex - kein Backtracking bei vielen Scripts
+    parts = []
+    pos = 0
+    while True:
+        start = _SCRIPT_OPEN_RE.search(html, pos)
+        if not start:
+            break
+        end = _SCRIPT_CLOSE_RES[start.group(1).lower()].search(html, start.end())
+        if not end:
+            break
+        parts.append(html[pos:start.start()])
+        pos = end.end()
+    parts.append(html[pos:])
+
+    return _EVENT_HANDLER_RE.sub('', ''.join(parts))
+
+
+# Text-Assets werden URL-kodiert statt Base64 (kein 33% Overhead)
+TEXT_MIME_TYPES = {'image/svg+xml', 'text/css', 'application/javascript'}
+TEXT_DATA_URL_MAX_SIZE = 1024 * 1024
+# Zeichen, die in src="...", url("...") und srcset unkodiert bleiben dürfen
+DATA_URL_SAFE_CHARS = "/:;=?@!$*+-._~[]"
+# Aktiver Base64-Codec für die Statistik, z.B. "pybase64 1.4.0 (C extension active - AVX2)"
+BASE64_CODEC = f"pybase64 {pybase64.get_version()}" if PYBASE64_AVAILABLE else "base64 (stdlib)"
+
+
+def b64encode_ascii(content: bytes) -> str:
+    """Base64-Kodierung als str - mit pybase64 (SIMD) falls installiert."""
+    if PYBASE64_AVAILABLE:
+        # pybase64 wählt beim Import den schnellsten Codec (AVX-512, AVX2, SSSE3, NEON),
+        # der aktive Pfad lässt sich mit pybase64.get_simd_path() prüfen
+        return pybase64.b64encode_as_string(content)
+    return base64.b64encode(content).decode('ascii')
+
+
+# Referenzen ohne ladbare Ressource: bereits eingebettet, Anker oder Pseudo-URLs
+INLINE_REF_PREFIXES = ('data:', 'about:', 'blob:', 'javascript:', 'mailto:', '#')
+
+
+def is_inline_reference(url: str) -> bool:
+    """True für Referenzen, die weder geladen noch umgeschrieben werden müssen."""
+    # Das längste Präfix ('javascript:') hat 11 Zeichen - nur so viel kleinschreiben
+    return url[:11].lower().startswith(INLINE_REF_PREFIXES)
+
+
+def safe_urljoin(base_url: str, url: str) -> Optional[str]:
+    """urljoin, das für ungültige URLs (z.B. "//[bad/x.png") None statt ValueError liefert."""
+    try:
+        return urljoin(base_url, url)
+    except ValueError:
+        return None
+
+
+def lower_shadow(html: str) -> str:
+    """Kleingeschriebene Kopie des HTML mit identischen Indizes (für Tag-Suchen)."""
+    html_lower = html.lower()
+    if len(html_lower) != len(html):
+        # Einzelne Unicode-Zeichen (z.B. 'İ') werden durch lower() länger
+        html_lower = html.translate(_ASCII_LOWER)
+    return html_lower
+
+
+def build_data_url(content: bytes, mime: str) -> str:
+    """Erzeugt eine Data-URL für den Inhalt (URL-kodiert für Text, sonst Base64)."""
+    b64_length = (len(content) + 2) // 3 * 4
+
+    if mime in TEXT_MIME_TYPES and len(content) <= TEXT_DATA_URL_MAX_SIZE:
+        try:
+            text = content.decode('utf-8')
+        except UnicodeDecodeError:
+            text = None
+
+        if text is not None:
+            if mime == 'image/svg+xml':
+                # Kommentare und Whitespace entfernen
+                text = _XML_COMMENT_RE.sub('', text)
+                text = _WHITESPACE_RE.sub(' ', text).strip()
+            quoted = quote(text, safe=DATA_URL_SAFE_CHARS)
+            # Nur nehmen, wenn es tatsächlich kürzer als Base64 ist
+            if len(quoted) < b64_length:
+                return f'data:{mime};charset=utf-8,{quoted}'
+
+    prefix = _BASE64_PREFIXES.get(mime)
+    if prefix is None:
+        # Unbekannte Typen sind der rohe Content-Type des Servers - nicht cachen,
+        # sonst wächst das Dict im Server-Modus mit beliebigen Header-Werten
+        prefix = f'data:{mime};base64,'
+    return prefix + b64encode_ascii(content)
+
+
+def dedupe_data_url(
+    content: bytes,
+    mime: str,
+    content_cache: Dict[Tuple[bytes, str], str]
+) -> Tuple[str, bool]:
+    """
+    Erzeugt die Data-URL nur einmal pro Inhalt (gleiche Bytes unter verschiedenen URLs).
+
+    Args:
+        content_cache: (Inhalts-Hash, MIME) -> data_url
+
+    Returns:
+        (data_url, True falls der Inhalt schon kodiert war)
+    """
+    key = (hashlib.blake2b(content, digest_size=16).digest(), mime)
+    data_url = content_cache.get(key)
+    if data_url is not None:
+        return data_url, True
+    data_url = build_data_url(content, mime)
+    content_cache[key] = data_url
+    return data_url, False
+
+
+def parse_srcset(srcset: str) -> List[Tuple[str, str]]:
+    """Zerlegt ein srcset in (url, descriptor)-Paare - Kommas in data:-URLs bleiben erhalten."""
+    candidates = []
+    pos = 0
+    length = len(srcset)
+
+    while pos < length:
+        # Whitespace und trennende Kommas überspringen
+        while pos < length and (srcset[pos].isspace() or srcset[pos] == ','):
+            pos += 1
+        if pos >= length:
+            break
+
+        # URL endet beim nächsten Whitespace
+        start = pos
+        while pos < length and not srcset[pos].isspace():
+            pos += 1
+        url = srcset[start:pos]
+        descriptor = ''
+
+        if url.endswith(','):
+            url = url.rstrip(',')
+        else:
+            end = srcset.find(',', pos)
+            if end == -1:
+                end = length
+            descriptor = srcset[pos:end].strip()
+            pos = end
+
+        if url:
+            candidates.append((url, descriptor))
+
+    return candidates
+
+
+def decode_css(content: bytes) -> str:
+    """Dekodiert CSS - verschiedene Encodings versuchen."""
+    for encoding in ['utf-8', 'latin-1', 'cp1252']:
+        try:
+            return content.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return content.decode('utf-8', errors='replace')
+
+
+def css_resource_urls(css_content: str, base_url: str) -> set:
+    """Sammelt die absoluten URLs aller url()-Referenzen in CSS (ohne data: und ungültige URLs)."""
+    urls = set()
+    for url in _CSS_URL_RE.findall(css_content):
+        if url and not is_inline_reference(url):
+            absolute_url = safe_urljoin(base_url, url.replace('\\', ''))
+            if absolute_url:
+                urls.add(absolute_url)
+    return urls
+
+
+def inline_css_resources(
+    css_content: str,
+    base_url: str,
+    url_cache: Optional[Dict[str, tuple]] = None,
+    data_url_cache: Optional[Dict[str, str]] = None,
+    content_cache: Optional[Dict[Tuple[bytes, str], str]] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Findet url() Referenzen in CSS und bettet sie als Base64 ein.
+
+    Args:
+        url_cache: Bereits geladene Ressourcen (url -> (content, content_type)),
+            wird um neu geladene Ressourcen ergänzt
+        data_url_cache: Bereits erzeugte Data-URLs (url -> data_url)
+        content_cache: Bereits erzeugte Data-URLs nach Inhalt (siehe dedupe_data_url)
+        stats: Optionales Stats-Dict, 'assets_deduped' wird hochgezählt
+    """
+    if url_cache is None:
+        url_cache = {}
+    if data_url_cache is None:
+        data_url_cache = {}
+    if content_cache is None:
+        content_cache = {}
+
+    # Fehlende Ressourcen vorab parallel laden - im Callback wird nur noch nachgeschlagen
+    missing_urls = css_resource_urls(css_content, base_url).difference(url_cache)
+    if missing_urls:
+        with ThreadPoolExecutor(max_workers=min(10, len(missing_urls))) as executor:
+            for url, content, content_type in executor.map(fetch_resource, missing_urls):
+                url_cache[url] = (content, content_type)
+
     def replace_url(match):
         try:
             url = match.group(1)
-            if not url or url.startswith('data:'):
+            if not url or is_inline_reference(url):
                 return match.group(0)
             
             # CSS-Escapes entfernen für URL-Auflösung
             clean_url = url.replace('\\', '')
             
             absolute_url = urljoin(base_url, clean_url)
-            _, content, content_type = fetch_resource(absolute_url)
-            
-            if content:
-                mime = get_mime_type(clean_url, content_type)
-                b64 = base64.b64encode(content).decode('utf-8')
-                return f'url("data:{mime};base64,{b64}")'
-            
-            return match.group(0)
+            data_url = data_url_cache.get(absolute_url)
+
+            if data_url is None:
+                content, content_type = url_cache.get(absolute_url, (None, ''))
+
+                if not content:
+                    return match.group(0)
+
+                data_url, deduped = dedupe_data_url(content, get_mime_type(clean_url, content_type), content_cache)
+                if deduped and stats is not None:
+                    stats['assets_deduped'] += 1
+                data_url_cache[absolute_url] = data_url
+
+            return f'url("{data_url}")'
         except Exception:
             return match.group(0)
     
     try:
-        return re.sub(url_pattern, replace_url, css_content)
+        return _CSS_URL_RE.sub(replace_url, css_content)
     except Exception:
         # Falls Regex fehlschlägt, Original zurückgeben
         return css_content
 
 
-def save_asset_to_file(content: bytes, url: str, assets_folder: str, asset_type: str = 'misc') -> str:
-    """Speichert Asset in Ordner und gibt relativen Pfad zurück."""
-    import hashlib
-    # Dateiname aus URL-Hash + Extension generieren
-    url_hash = hashlib.md5(url.encode()).hexdigest()[:12]
+def write_file_bytes(path: str, data: bytes):
+    """Schreibt Bytes direkt über den Dateideskriptor - ein write() für die ganze Datei."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            # os.write kann weniger als angefordert schreiben
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_file_atomic(path: Path, data: bytes):
+    """
+    Schreibt erst in eine temporäre Datei im selben Ordner und benennt sie dann
+    um - ein abgebrochener Lauf hinterlässt keine halbe Datei unter dem Zielnamen.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.urandom(4).hex()}.tmp")
+    try:
+        write_file_bytes(str(tmp_path), data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def asset_file_complete(path: Path, size: int) -> bool:
+    """True, wenn die Asset-Datei (Name = Inhalts-Hash) schon vollständig vorliegt."""
+    try:
+        return path.stat().st_size == size
+    except OSError:
+        return False
+
+
+def save_asset_to_file(
+    content: bytes,
+    url: str,
+    assets_folder: str,
+    asset_type: str = 'misc',
+    saved_assets: Optional[Dict[str, str]] = None,
+    pending_writes: Optional[Dict[Path, bytes]] = None,
+    created_dirs: Optional[Set[Path]] = None
+) -> str:
+    """
+    Speichert Asset in Ordner und gibt relativen Pfad zurück.
+
+    Der Dateiname ist ein Hash des Inhalts - identische Dateien unter
+    verschiedenen URLs werden nur einmal geschrieben.
+
+    Args:
+        saved_assets: Optionales Dict url -> relativer Pfad, damit bereits
+            gespeicherte URLs nicht erneut gehasht werden
+        pending_writes: Optionales Dict Dateipfad -> Inhalt; statt sofort zu
+            schreiben wird die Datei dort vorgemerkt (siehe write_files)
+        created_dirs: Optionales Set der in diesem Lauf bereits angelegten
+            Unterordner - spart den mkdir-Aufruf pro Asset
+    """
+    if saved_assets is not None and url in saved_assets:
+        return saved_assets[url]
+
+    # Dateiname aus Content-Hash + Extension generieren
+    content_hash = hashlib.blake2b(content, digest_size=8).hexdigest()
     parsed = urlparse(url)
     path_parts = parsed.path.split('/')
     original_name = path_parts[-1] if path_parts[-1] else 'asset'
@@ -179,357 +776,539 @@ def save_asset_to_file(content: bytes, url: str, assets_folder: str, asset_type:
     ext = ''
     if '.' in original_name:
         ext = '.' + original_name.split('.')[-1].split('?')[0][:10]
-    filename = f"{url_hash}{ext}"
+    filename = f"{content_hash}{ext}"
 
     # Unterordner nach Typ
     subdir = Path(assets_folder) / asset_type
-    subdir.mkdir(exist_ok=True)
+    if created_dirs is None or subdir not in created_dirs:
+        subdir.mkdir(parents=True, exist_ok=True)
+        if created_dirs is not None:
+            created_dirs.add(subdir)
 
+    # Vorhandene Dateien nur überspringen, wenn sie vollständig sind (z.B. von
+    # älteren, abgebrochenen Läufen)
     filepath = subdir / filename
-    filepath.write_bytes(content)
-    return f"{assets_folder}/{asset_type}/{filename}"
+    if pending_writes is not None:
+        if filepath not in pending_writes and not asset_file_complete(filepath, len(content)):
+            pending_writes[filepath] = content
+    elif not asset_file_complete(filepath, len(content)):
+        write_file_atomic(filepath, content)
+
+    local_path = f"{assets_folder}/{asset_type}/{filename}"
+    if saved_assets is not None:
+        saved_assets[url] = local_path
+    return local_path
+
 
+async def write_files(files: Dict[Path, bytes], max_workers: int = DEFAULT_CONCURRENCY) -> List[str]:
+    """
+    Schreibt vorgemerkte Dateien gebündelt in einem Thread-Pool, ohne den
+    Event-Loop zu blockieren.
+
+    Returns:
+        Fehlermeldungen für Dateien, die nicht geschrieben werden konnten
+    """
+    if not files:
+        return []
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, write_file_atomic, path, content) for path, content in files.items()),
+            return_exceptions=True
+        )
+    return [
+        f"Asset nicht gespeichert: {path} - {result}"
+        for path, result in zip(files, results)
+        if isinstance(result, BaseException)
+    ]
 
-def create_standalone_html(
+
+async def create_standalone_html(
     html: str,
     base_url: str,
     project_name: str = "Preview",
     include_watermark: bool = False,
     remove_scripts: bool = True,
-    max_workers: int = 10,
+    max_workers: int = DEFAULT_CONCURRENCY,
     assets_mode: str = 'embed',
-    assets_folder: Optional[str] = None
+    assets_folder: Optional[str] = None,
+    session=None,
+    resource_cache: Optional[Dict[str, tuple]] = None
 ) -> Dict[str, Any]:
     """
     Konvertiert HTML zu einer selbstständigen Datei mit eingebetteten Ressourcen.
 
     Args:
-        assets_mode: 'embed' (Base64), 'download' (Ordner), 'hotlink' (Original-URLs)
+        max_workers: Maximal gleichzeitige Downloads beim Laden der Ressourcen
+        assets_mode: 'embed' (Base64), 'download' (Ordner), 'hotlink' (Original-URLs),
+            'mhtml' (ein MHTML-Archiv, siehe build_mhtml)
         assets_folder: Ordnername für download-Modus
+        session: Optionale Session (siehe create_fetch_session) für das Laden der Ressourcen
+        resource_cache: Bereits vom Browser geladene Ressourcen
+            (url -> (content, content_type)); nur fehlende URLs werden geladen
     """
-    stats = {
+    stats: Dict[str, Any] = {
         'stylesheets_inlined': 0,
         'images_inlined': 0,
         'fonts_inlined': 0,
         'assets_downloaded': 0,
+        'assets_deduped': 0,
+        'assets_bundled': 0,
+        'assets_skipped_inline': 0,
         'total_size_before': len(html),
         'resources_failed': 0,
+        'base64_codec': BASE64_CODEC,
         'source_url': base_url
     }
     errors = []
     
-    # 1. Scripts entfernen (optional)
+    # Mit selectolax wird das HTML später einmal geparst und direkt im DOM bearbeitet,
+    # sonst laufen die Regex-Durchläufe über den HTML-String
+    process_assets = assets_mode != 'hotlink' and (REQUESTS_AVAILABLE or AIOHTTP_AVAILABLE or HTTPX_AVAILABLE)
+    use_tree = process_assets and SELECTOLAX_AVAILABLE
+
+    # 1. Scripts entfernen (optional) - mit selectolax werden die Tags im DOM entfernt
     if remove_scripts:
-        html = re.sub(r'<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>', '', html, flags=re.IGNORECASE | re.DOTALL)
-        html = re.sub(r'\s+on\w+="[^"]*"', '', html, flags=re.IGNORECASE)
-        html = re.sub(r"\s+on\w+='[^']*'", '', html, flags=re.IGNORECASE)
+        html = _EVENT_HANDLER_RE.sub('', html) if use_tree else strip_scripts(html)
 
     # 2. Lazy-Load Attribute konvertieren (data-src -> src, data-srcset -> srcset)
-    lazy_attrs = ['data-src', 'data-lazy-src', 'data-original', 'data-lazy', 'data-iesrc']
-    for attr in lazy_attrs:
-        # Für img und picture Tags ohne src oder mit Placeholder-src
-        html = re.sub(
-            rf'(<(?:img|picture)[^>]*?)(?:\s+src=["\'][^"\']*["\'])?\s+{attr}=["\']([^"\']+)["\']([^>]*>)',
-            r'\1 src="\2"\3',
-            html,
-            flags=re.IGNORECASE
-        )
+    html = _LAZY_RE.sub(r'\1 src="\2"\3', html)
 
     # data-srcset -> srcset
-    html = re.sub(
-        r'(<(?:img|source)[^>]*?)\s+data-srcset=["\']([^"\']+)["\']',
-        r'\1 srcset="\2"',
-        html,
-        flags=re.IGNORECASE
-    )
+    html = _LAZY_SRCSET_RE.sub(r'\1 srcset="\2"', html)
 
     # loading="lazy" entfernen (nicht mehr nötig für Standalone)
-    html = re.sub(r'\s+loading=["\']lazy["\']', '', html, flags=re.IGNORECASE)
-
-    # 3. Externe Stylesheets verarbeiten
-    if assets_mode != 'hotlink':
-        stylesheet_patterns = [
-            r'<link[^>]+rel=["\']stylesheet["\'][^>]+href=["\']([^"\']+)["\'][^>]*>',
-            r'<link[^>]+href=["\']([^"\']+)["\'][^>]+rel=["\']stylesheet["\'][^>]*>',
-            r'<link[^>]+href=["\']([^"\']+\.css[^"\']*)["\'][^>]*>'
-        ]
-
-        stylesheet_matches = set()
-        for pattern in stylesheet_patterns:
-            matches = re.findall(pattern, html, re.IGNORECASE)
-            stylesheet_matches.update(matches)
-
-        # Stylesheets parallel laden
-        if stylesheet_matches and REQUESTS_AVAILABLE:
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {}
-                for href in stylesheet_matches:
-                    absolute_url = urljoin(base_url, href)
-                    futures[executor.submit(fetch_resource, absolute_url)] = href
-
-                for future in as_completed(futures):
-                    href = futures[future]
-                    url, content, content_type = future.result()
-
-                    if content:
-                        try:
-                            # CSS dekodieren - verschiedene Encodings versuchen
-                            css_content = None
-                            for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                                try:
-                                    css_content = content.decode(encoding)
-                                    break
-                                except (UnicodeDecodeError, LookupError):
-                                    continue
-
-                            if css_content is None:
-                                css_content = content.decode('utf-8', errors='replace')
-
-                            href_escaped = re.escape(href.split("?")[0])
-                            link_pattern = rf'<link[^>]+href=["\'][^"\']*{href_escaped}[^"\']*["\'][^>]*>'
-
-                            if assets_mode == 'embed':
-                                # CSS-interne Ressourcen einbetten
-                                css_content = inline_css_resources(css_content, url)
-                                replacement = f'<style>/* Inlined: {href} */\n{css_content}</style>'
-                                html = re.sub(link_pattern, lambda m: replacement, html, count=1, flags=re.IGNORECASE)
-                                stats['stylesheets_inlined'] += 1
-                            elif assets_mode == 'download' and assets_folder:
-                                # CSS in Datei speichern
-                                local_path = save_asset_to_file(content, url, assets_folder, 'css')
-                                html = re.sub(link_pattern, f'<link rel="stylesheet" href="{local_path}">', html, count=1, flags=re.IGNORECASE)
-                                stats['assets_downloaded'] += 1
-
-                        except Exception as e:
-                            errors.append(f"CSS Parse-Fehler: {href} - {str(e)}")
-                            stats['resources_failed'] += 1
-                    else:
-                        errors.append(f"CSS nicht geladen: {href} - {content_type}")
-                        stats['resources_failed'] += 1
-    
-    # 4. Bilder verarbeiten (<img src> und <picture src>)
-    if assets_mode != 'hotlink':
-        img_pattern = r'(<(?:img|picture)[^>]+src=)(["\'])([^"\']+)(\2[^>]*>)'
+    html = _LOADING_LAZY_RE.sub('', html)
+
+    # 3. Ressourcen-Referenzen sammeln
+    tree = LexborHTMLParser(html) if use_tree else None
+
+    stylesheet_links: List[Tuple[str, Any]] = []  # (href, node) - node ist None ohne selectolax
+    resource_srcs = []
+    if tree is not None:
+        if remove_scripts:
+            for node in tree.css(SCRIPT_SELECTOR):
+                node.decompose()
+        for node in tree.css(STYLESHEET_LINK_SELECTOR):
+            attrs = node.attrs
+            href = attrs.get('href')
+            rel = (attrs.get('rel') or '').lower()
+            if href and (rel == 'stylesheet' or '.css' in href.lower()):
+                stylesheet_links.append((href, node))
+        for node in tree.css(IMG_SRC_SELECTOR):
+            resource_srcs.append(node.attrs.get('src'))
+        for node in tree.css(SRCSET_SELECTOR):
+            resource_srcs.extend(src for src, _ in parse_srcset(node.attrs.get('srcset') or ''))
+        for node in tree.css(STYLE_ATTR_SELECTOR):
+            for url in _CSS_URL_RE.findall(node.attrs.get('style') or ''):
+                resource_srcs.append(url.replace('\\', ''))
+    elif process_assets:
+        hrefs = {next(group for group in match.groups() if group) for match in _STYLESHEET_RE.finditer(html)}
+        stylesheet_links = [(href, None) for href in hrefs]
+        for match in _ASSET_RE.finditer(html):
+            if not match.group('tag'):
+                resource_srcs.append(match.group('style_url'))
+                continue
+
+            tag_html = match.group(0)
+            if match.group('tag').lower() != 'source':
+                resource_srcs.extend(attr.group(3) for attr in _SRC_ATTR_RE.finditer(tag_html))
+            for attr in _SRCSET_RE.finditer(tag_html):
+                resource_srcs.extend(src for src, _ in parse_srcset(attr.group(1)))
+            resource_srcs.extend(attr.group('style_url') for attr in _STYLE_URL_RE.finditer(tag_html))
+
+    # 4. Alle Ressourcen parallel laden (was der Browser schon hat, nicht erneut)
+    url_cache = dict(resource_cache) if resource_cache else {}
+    if process_assets:
+        # Ungültige URLs werden übersprungen und später als nicht geladen gemeldet
+        resource_urls = {safe_urljoin(base_url, href) for href, _ in stylesheet_links}
+        for src in resource_srcs:
+            if not src:
+                continue
+            if is_inline_reference(src):
+                stats['assets_skipped_inline'] += 1
+            else:
+                resource_urls.add(safe_urljoin(base_url, src))
+        resource_urls.discard(None)
+        resource_urls.difference_update(url_cache)
+        url_cache.update(await fetch_resources(resource_urls, max_workers=max_workers, session=session))
+
+    # url()-Referenzen aller Stylesheets (Fonts, Hintergründe) gesammelt in einem
+    # zweiten parallelen Durchlauf laden statt einzeln beim Einbetten
+    css_texts = {}
+    if process_assets and assets_mode in ('embed', 'mhtml'):
+        css_urls = set()
+        for href, _ in stylesheet_links:
+            url = safe_urljoin(base_url, href)
+            if url is None:
+                continue
+            content = url_cache.get(url, (None, ''))[0]
+            if content and url not in css_texts:
+                css_texts[url] = decode_css(content)
+                css_urls.update(css_resource_urls(css_texts[url], url))
+        css_urls.difference_update(url_cache)
+        url_cache.update(await fetch_resources(css_urls, max_workers=max_workers, session=session))
+
+    def get_resource(absolute_url):
+        return url_cache.get(absolute_url, (None, 'nicht geladen'))
+
+    # mhtml-Modus: Assets behalten ihre absolute URL und werden als eigene Parts abgelegt
+    mhtml_resources = {}
+
+    def bundle_resource(absolute_url, content, content_type):
+        if absolute_url not in mhtml_resources:
+            mhtml_resources[absolute_url] = (content, get_mime_type(absolute_url, content_type))
+            stats['assets_bundled'] += 1
+        return absolute_url
+
+    # Base64 nur einmal pro URL und pro Inhalt berechnen (Sprites, Icons, srcset-Duplikate)
+    data_url_cache: Dict[str, str] = {}
+    content_cache: Dict[Tuple[bytes, str], str] = {}
+
+    def get_data_url(absolute_url, src, content, content_type):
+        data_url = data_url_cache.get(absolute_url)
+        if data_url is None:
+            data_url, deduped = dedupe_data_url(content, get_mime_type(src, content_type), content_cache)
+            if deduped:
+                stats['assets_deduped'] += 1
+            data_url_cache[absolute_url] = data_url
+        return data_url
+
+    # Bereits gespeicherte Assets (download-Modus): url -> lokaler Pfad,
+    # die Dateien selbst werden gesammelt und erst am Ende gebündelt geschrieben
+    saved_assets: Dict[str, str] = {}
+    pending_writes: Dict[Path, bytes] = {}
+    # Nur pro Lauf merken - der Ordner kann zwischen zwei Aufrufen gelöscht werden
+    created_dirs: Set[Path] = set()
+
+    def resolve_asset(src):
+        """Gibt Data-URL bzw. lokalen Pfad für ein Bild zurück, None falls nicht geladen."""
+        absolute_url = safe_urljoin(base_url, src)
+        if absolute_url is None:
+            return None
+        content, content_type = get_resource(absolute_url)
+
+        if content:
+            if assets_mode == 'embed':
+                stats['images_inlined'] += 1
+                return get_data_url(absolute_url, src, content, content_type)
+            elif assets_mode == 'download' and assets_folder:
+                stats['assets_downloaded'] += 1
+                return save_asset_to_file(content, absolute_url, assets_folder, 'images', saved_assets, pending_writes, created_dirs)
+            elif assets_mode == 'mhtml':
+                return bundle_resource(absolute_url, content, content_type)
+        return None
+
+    def rewrite_srcset(srcset):
+        new_parts = []
+        for src, descriptor in parse_srcset(srcset):
+            new_src = None if is_inline_reference(src) else resolve_asset(src)
+            new_parts.append(f'{new_src or src} {descriptor}'.strip())
+        return ', '.join(new_parts)
+
+    def rewrite_style(style):
+        def replace_url(match):
+            url = match.group(1).replace('\\', '')
+            if is_inline_reference(url):
+                return match.group(0)
+            new_url = resolve_asset(url)
+            return f"url('{new_url}')" if new_url else match.group(0)
 
-        def replace_image(match):
-            prefix = match.group(1)
-            quote = match.group(2)
-            src = match.group(3)
-            suffix = match.group(4)
+        return _CSS_URL_RE.sub(replace_url, style)
 
-            if src.startswith('data:'):
-                return match.group(0)
+    def load_stylesheet(href):
+        """Gibt das Ersatz-Markup für ein Stylesheet zurück, None bei Fehlern."""
+        url = safe_urljoin(base_url, href)
+        if url is None:
+            errors.append(f"CSS nicht geladen: {href} - ungültige URL")
+            stats['resources_failed'] += 1
+            return None
+        content, content_type = get_resource(url)
+
+        if not content:
+            errors.append(f"CSS nicht geladen: {href} - {content_type}")
+            stats['resources_failed'] += 1
+            return None
 
-            absolute_url = urljoin(base_url, src)
-            _, content, content_type = fetch_resource(absolute_url)
-
-            if content:
-                if assets_mode == 'embed':
-                    mime = get_mime_type(src, content_type)
-                    b64 = base64.b64encode(content).decode('utf-8')
-                    data_url = f'data:{mime};base64,{b64}'
-                    stats['images_inlined'] += 1
-                    return f'{prefix}{quote}{data_url}{suffix}'
-                elif assets_mode == 'download' and assets_folder:
-                    local_path = save_asset_to_file(content, absolute_url, assets_folder, 'images')
-                    stats['assets_downloaded'] += 1
-                    return f'{prefix}{quote}{local_path}{suffix}'
+        try:
+            if assets_mode == 'embed':
+                # CSS-interne Ressourcen einbetten
+                css_text = css_texts.get(url)
+                if css_text is None:
+                    css_text = decode_css(content)
+                css_content = inline_css_resources(css_text, url, url_cache, data_url_cache, content_cache, stats)
+                stats['stylesheets_inlined'] += 1
+                return f'<style>/* Inlined: {href} */\n{css_content}</style>'
+            elif assets_mode == 'download' and assets_folder:
+                # CSS in Datei speichern
+                local_path = save_asset_to_file(content, url, assets_folder, 'css', saved_assets, pending_writes, created_dirs)
+                stats['assets_downloaded'] += 1
+                return f'<link rel="stylesheet" href="{local_path}">'
+            elif assets_mode == 'mhtml':
+                # url() im CSS wird relativ zur Content-Location des Stylesheets aufgelöst
+                css_text = css_texts.get(url)
+                if css_text is None:
+                    css_text = decode_css(content)
+                for css_url in css_resource_urls(css_text, url):
+                    css_content, css_content_type = get_resource(css_url)
+                    if css_content:
+                        bundle_resource(css_url, css_content, css_content_type)
+                bundle_resource(url, content, content_type)
+                return f'<link rel="stylesheet" href="{url}">'
+        except Exception as e:
+            errors.append(f"CSS Parse-Fehler: {href} - {str(e)}")
+            stats['resources_failed'] += 1
+        return None
+
+    if tree is not None:
+        # 5. Referenzen im DOM ersetzen (ein Parse, ein Serialisieren)
+        for href, node in stylesheet_links:
+            replacement = load_stylesheet(href)
+            if replacement:
+                new_node = LexborHTMLParser(replacement).css_first(REPLACEMENT_SELECTOR)
+                if new_node is not None:
+                    node.replace_with(new_node)
+
+        # node.attrs erzeugt bei jedem Zugriff ein neues Objekt - einmal pro Node binden
+        for node in tree.css(IMG_SRC_SELECTOR):
+            attrs = node.attrs
+            src = attrs.get('src')
+            if not src or is_inline_reference(src):
+                continue
+            new_src = resolve_asset(src)
+            if new_src:
+                attrs['src'] = new_src
             else:
                 errors.append(f"Bild nicht geladen: {src}")
                 stats['resources_failed'] += 1
-            return match.group(0)
-
-        if REQUESTS_AVAILABLE:
-            html = re.sub(img_pattern, replace_image, html, flags=re.IGNORECASE)
-    
-    # 5. srcset Bilder verarbeiten
-    if assets_mode != 'hotlink':
-        srcset_pattern = r'srcset=["\']([^"\']+)["\']'
 
-        def replace_srcset(match):
-            srcset = match.group(1)
-            new_srcset_parts = []
+        for node in tree.css(SRCSET_SELECTOR):
+            attrs = node.attrs
+            srcset = attrs.get('srcset')
+            if srcset:
+                attrs['srcset'] = rewrite_srcset(srcset)
 
-            for part in srcset.split(','):
-                part = part.strip()
-                if not part:
-                    continue
+        for node in tree.css(STYLE_ATTR_SELECTOR):
+            attrs = node.attrs
+            style = attrs.get('style')
+            if style and 'url(' in style:
+                attrs['style'] = rewrite_style(style)
 
-                pieces = part.split()
-                if not pieces:
-                    continue
+        # tree.html ist nur bei einem leeren Dokument None
+        html = tree.html or html
 
-                src = pieces[0]
-                descriptor = pieces[1] if len(pieces) > 1 else ''
+    else:
+        # 5. Externe Stylesheets ersetzen - ein Durchlauf statt einem re.sub pro Stylesheet
+        stylesheet_replacements = {}
+        for href, _ in stylesheet_links:
+            replacement = load_stylesheet(href)
+            if replacement:
+                stylesheet_replacements[href] = replacement
+
+        def replace_stylesheet(match):
+            href = next(group for group in match.groups() if group)
+            # Jeder Link wird nur beim ersten Vorkommen ersetzt
+            return stylesheet_replacements.pop(href, match.group(0))
+
+        if stylesheet_replacements:
+            html = _STYLESHEET_RE.sub(replace_stylesheet, html)
+
+        # 6. Bilder verarbeiten (<img src> und <picture src>)
+        def replace_image(match):
+            src = match.group(3)
+            if is_inline_reference(src):
+                return match.group(0)
 
-                if src.startswith('data:'):
-                    new_srcset_parts.append(part)
-                    continue
+            new_src = resolve_asset(src)
+            if new_src:
+                return f'{match.group(1)}{match.group(2)}{new_src}{match.group(4)}'
 
-                absolute_url = urljoin(base_url, src)
-                _, content, content_type = fetch_resource(absolute_url)
-
-                if content:
-                    if assets_mode == 'embed':
-                        mime = get_mime_type(src, content_type)
-                        b64 = base64.b64encode(content).decode('utf-8')
-                        data_url = f'data:{mime};base64,{b64}'
-                        new_srcset_parts.append(f'{data_url} {descriptor}'.strip())
-                        stats['images_inlined'] += 1
-                    elif assets_mode == 'download' and assets_folder:
-                        local_path = save_asset_to_file(content, absolute_url, assets_folder, 'images')
-                        new_srcset_parts.append(f'{local_path} {descriptor}'.strip())
-                        stats['assets_downloaded'] += 1
-                else:
-                    new_srcset_parts.append(part)
-
-            if new_srcset_parts:
-                return f'srcset="{", ".join(new_srcset_parts)}"'
+            errors.append(f"Bild nicht geladen: {src}")
+            stats['resources_failed'] += 1
             return match.group(0)
 
-        if REQUESTS_AVAILABLE:
-            html = re.sub(srcset_pattern, replace_srcset, html, flags=re.IGNORECASE)
-    
-    # 6. Background-Images in Style-Attributen
-    if assets_mode != 'hotlink':
-        style_url_pattern = r'(style=["\'][^"\']*url\(["\']?)([^"\')\s]+)(["\']?\)[^"\']*["\'])'
+        # 7. srcset Bilder verarbeiten (auch <picture><source>)
+        def replace_srcset(match):
+            new_srcset = rewrite_srcset(match.group(1))
+            return f'srcset="{new_srcset}"' if new_srcset else match.group(0)
 
+        # 8. Background-Images in Style-Attributen
         def replace_style_url(match):
-            prefix = match.group(1)
-            url = match.group(2)
-            suffix = match.group(3)
-
-            if url.startswith('data:'):
+            url = match.group('style_url')
+            if is_inline_reference(url):
                 return match.group(0)
 
-            absolute_url = urljoin(base_url, url)
-            _, content, content_type = fetch_resource(absolute_url)
-
-            if content:
-                if assets_mode == 'embed':
-                    mime = get_mime_type(url, content_type)
-                    b64 = base64.b64encode(content).decode('utf-8')
-                    data_url = f'data:{mime};base64,{b64}'
-                    stats['images_inlined'] += 1
-                    return f'{prefix}{data_url}{suffix}'
-                elif assets_mode == 'download' and assets_folder:
-                    local_path = save_asset_to_file(content, absolute_url, assets_folder, 'images')
-                    stats['assets_downloaded'] += 1
-                    return f'{prefix}{local_path}{suffix}'
-
-            return match.group(0)
-
-        if REQUESTS_AVAILABLE:
-            html = re.sub(style_url_pattern, replace_style_url, html, flags=re.IGNORECASE)
-    
-    # 7. <picture><source> verarbeiten
-    if assets_mode != 'hotlink':
-        source_pattern = r'(<source[^>]+srcset=)(["\'])([^"\']+)(\2[^>]*>)'
-
-        def replace_source(match):
-            prefix = match.group(1)
-            quote = match.group(2)
-            srcset = match.group(3)
-            suffix = match.group(4)
-
-            new_parts = []
-            for part in srcset.split(','):
-                part = part.strip()
-                if not part:
-                    continue
-
-                pieces = part.split()
-                src = pieces[0]
-                descriptor = pieces[1] if len(pieces) > 1 else ''
-
-                if src.startswith('data:'):
-                    new_parts.append(part)
-                    continue
-
-                absolute_url = urljoin(base_url, src)
-                _, content, content_type = fetch_resource(absolute_url)
-
-                if content:
-                    if assets_mode == 'embed':
-                        mime = get_mime_type(src, content_type)
-                        b64 = base64.b64encode(content).decode('utf-8')
-                        data_url = f'data:{mime};base64,{b64}'
-                        new_parts.append(f'{data_url} {descriptor}'.strip())
-                        stats['images_inlined'] += 1
-                    elif assets_mode == 'download' and assets_folder:
-                        local_path = save_asset_to_file(content, absolute_url, assets_folder, 'images')
-                        new_parts.append(f'{local_path} {descriptor}'.strip())
-                        stats['assets_downloaded'] += 1
-                else:
-                    new_parts.append(part)
-
-            if new_parts:
-                return f'{prefix}{quote}{", ".join(new_parts)}{suffix}'
+            new_url = resolve_asset(url)
+            if new_url:
+                return f"{match.group('style_prefix')}{new_url}{match.group('style_suffix')}"
             return match.group(0)
 
-        if REQUESTS_AVAILABLE:
-            html = re.sub(source_pattern, replace_source, html, flags=re.IGNORECASE)
-
-    # 8. Scroll-Fix einfügen (überschreibt overflow:hidden von Modals/Cookie-Bannern)
-    scroll_fix_css = '<style id="standalone-scroll-fix">html, body { overflow: auto !important; overflow-x: hidden !important; height: auto !important; max-height: none !important; position: static !important; }</style>'
-    if '</head>' in html.lower():
-        html = re.sub(r'(</head>)', scroll_fix_css + r'\1', html, count=1, flags=re.IGNORECASE)
-    elif '<body' in html.lower():
-        html = re.sub(r'(<body[^>]*>)', r'\1' + scroll_fix_css, html, count=1, flags=re.IGNORECASE)
+        # Ein re.sub über das ganze Dokument - Tags werden lokal weiterverarbeitet
+        def replace_asset(match):
+            if not match.group('tag'):
+                return replace_style_url(match)
+
+            tag_html = match.group(0)
+            if match.group('tag').lower() != 'source':
+                tag_html = _SRC_ATTR_RE.sub(replace_image, tag_html)
+            tag_html = _SRCSET_RE.sub(replace_srcset, tag_html)
+            return _STYLE_URL_RE.sub(replace_style_url, tag_html)
+
+        if url_cache:
+            html = _ASSET_RE.sub(replace_asset, html)
+
+    # Vorgemerkte Assets (download-Modus) parallel schreiben
+    write_errors = await write_files(pending_writes, max_workers)
+    errors.extend(write_errors)
+    stats['resources_failed'] += len(write_errors)
+
+    # Kleingeschriebene Kopie nur einmal erzeugen und für alle Tag-Suchen nutzen
+    html_lower = lower_shadow(html)
+    head_pos = html_lower.find('</head>')
+    body_pos = html_lower.find('<body')
+    body_end = html_lower.find('>', body_pos) + 1 if body_pos != -1 else 0
+    doctype_pos = html_lower.find('<!doctype')
+    doctype_end = html_lower.find('>', doctype_pos) + 1 if doctype_pos != -1 else 0
+
+    # Einfügungen als (Position, Text) sammeln und am Ende in einem Durchlauf einsetzen
+    insertions = []
+
+    # Zeitstempel einmal für Wasserzeichen und Meta-Kommentar
+    now = datetime.now()
+
+    # 9. Scroll-Fix einfügen (überschreibt overflow:hidden von Modals/Cookie-Bannern)
+    if head_pos != -1:
+        insertions.append((head_pos, SCROLL_FIX_CSS))
     else:
-        html = scroll_fix_css + html
+        insertions.append((body_end, SCROLL_FIX_CSS))
 
-    # 9. Wasserzeichen einfügen (optional)
+    # 10. Wasserzeichen einfügen (optional) - direkt nach <body> bzw. am Anfang
     if include_watermark:
-        timestamp = datetime.now().strftime('%d.%m.%Y %H:%M')
-        watermark = WATERMARK_HTML.format(timestamp=timestamp, project_name=project_name)
-        
-        if '<body' in html.lower():
-            html = re.sub(r'(<body[^>]*>)', r'\1' + watermark, html, count=1, flags=re.IGNORECASE)
-        else:
-            html = watermark + html
-    
-    # 10. Meta-Kommentar hinzufügen
-    parsed_url = urlparse(base_url)
-    domain = parsed_url.netloc[:50] if parsed_url.netloc else base_url[:50]
-    
-    meta_comment = f"""<!--
-╔══════════════════════════════════════════════════════════════════════════╗
-║  STANDALONE HTML PREVIEW                                                  ║
-╠══════════════════════════════════════════════════════════════════════════╣
-║  Projekt:  {project_name:<62} ║
-║  Erstellt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S'):<62} ║
-║  Quelle:   {domain:<62} ║
-╠══════════════════════════════════════════════════════════════════════════╣
-║  Diese Datei funktioniert offline und enthält alle eingebetteten         ║
-║  Ressourcen. Sie dient nur zur Vorschau - nicht für Produktion.          ║
-╚══════════════════════════════════════════════════════════════════════════╝
--->
-"""
-    if '<!DOCTYPE' in html.upper():
-        html = re.sub(r'(<!DOCTYPE[^>]*>)', r'\1\n' + meta_comment, html, count=1, flags=re.IGNORECASE)
+        watermark = WATERMARK_HTML.format(timestamp=now.strftime('%d.%m.%Y %H:%M'), project_name=project_name)
+        insertions.append((body_end, watermark))
+
+    # 11. Meta-Kommentar hinzufügen
+    domain = urlparse(base_url).netloc[:50] or base_url[:50]
+    meta_comment = META_COMMENT.format(
+        project_name=project_name,
+        created=now.strftime('%Y-%m-%d %H:%M:%S'),
+        domain=domain
+    )
+    if doctype_end:
+        insertions.append((doctype_end, '\n' + meta_comment))
     else:
-        html = meta_comment + html
+        insertions.append((0, meta_comment))
+
+    # An gleicher Position steht die später hinzugefügte Einfügung vorne
+    parts = []
+    last = 0
+    for _, (pos, text) in sorted(enumerate(insertions), key=lambda item: (item[1][0], -item[0])):
+        parts.append(html[last:pos])
+        parts.append(text)
+        last = pos
+    parts.append(html[last:])
+    html = ''.join(parts)
     
     stats['total_size_after'] = len(html)
     
     return {
         'html': html,
         'stats': stats,
-        'errors': errors
+        'errors': errors,
+        'resources': mhtml_resources
     }
 
 
+# Ressourcentypen, deren Bytes beim Laden der Seite mitgeschnitten werden
+# (Video/Audio wird nie eingebettet - deren oft große Bodies nicht auslesen)
+CAPTURE_RESOURCE_TYPES = {'stylesheet', 'image', 'font'}
+
+
+async def collect_asset_cache(responses) -> Dict[str, tuple]:
+    """Liest die Bodies der vom Browser geladenen Assets (url -> (content, content_type))."""
+    # Pro URL nur einen Body auslesen (Sprites, mehrfach geladene Fonts)
+    responses = list({
+        response.url: response for response in responses
+        if response.ok
+        and response.request.resource_type in CAPTURE_RESOURCE_TYPES
+        and not response.url.startswith('data:')
+    }.values())
+    bodies = await asyncio.gather(*(response.body() for response in responses), return_exceptions=True)
+    return {
+        response.url: (body, response.headers.get('content-type', ''))
+        for response, body in zip(responses, bodies)
+        if isinstance(body, bytes)
+    }
+
+
+class PlaywrightSession:
+    """
+    Hält einen Chromium-Browser offen, damit mehrere Seiten ohne erneuten
+    Browser-Start geladen werden können.
+
+    Usage:
+        async with PlaywrightSession() as browser_session:
+            result = await fetch_page_html(url, browser_session=browser_session)
+    """
+
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self.playwright: Any = None
+        self.browser: Any = None
+
+    async def start(self) -> 'PlaywrightSession':
+        if self.browser is None:
+            from playwright.async_api import async_playwright
+
+            self.playwright = await async_playwright().start()
+            try:
+                self.browser = await self.playwright.chromium.launch(headless=self.headless)
+            except BaseException:
+                # Ohne Browser den Playwright-Treiber nicht weiterlaufen lassen
+                await self.close()
+                raise
+        return self
+
+    async def close(self):
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def new_context(self, viewport_width: int = 1920, viewport_height: int = 1080):
+        return await self.browser.new_context(
+            viewport={'width': viewport_width, 'height': viewport_height},
+            ignore_https_errors=True,
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        )
+
+    async def __aenter__(self) -> 'PlaywrightSession':
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
 async def fetch_page_html(
     url: str,
     wait_for_network: bool = True,
     close_cookie_banner: bool = True,
     timeout: int = 30000,
     viewport_width: int = 1920,
-    viewport_height: int = 1080
+    viewport_height: int = 1080,
+    browser_session: Optional[PlaywrightSession] = None,
+    capture_assets: bool = True
 ) -> Dict[str, Any]:
     """
     Lädt eine Webseite mit Playwright und gibt das HTML zurück.
+
+    Args:
+        browser_session: Optionaler, bereits gestarteter Browser. Ohne wird für
+            diesen Aufruf ein eigener Browser gestartet und wieder beendet.
+        capture_assets: Vom Browser geladene Assets mitschneiden und unter
+            'assets' zurückgeben (url -> (content, content_type))
     """
     if not PLAYWRIGHT_AVAILABLE:
         return {
@@ -537,131 +1316,198 @@ async def fetch_page_html(
             'error': 'Playwright nicht installiert. Bitte "pip install playwright && playwright install chromium" ausführen.'
         }
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            viewport={'width': viewport_width, 'height': viewport_height},
-            ignore_https_errors=True,
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
+    own_session = browser_session is None
+    if browser_session is None:
+        browser_session = await PlaywrightSession().start()
+
+    context = None
+    responses: List[Any] = []
+    try:
+        # Pro URL nur ein neuer Context (billig) statt eines neuen Browsers
+        context = await browser_session.new_context(viewport_width, viewport_height)
         page = await context.new_page()
-        
-        try:
-            # Seite laden
-            await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
-            
-            # Auf Netzwerk warten
-            if wait_for_network:
+
+        # Chromium lädt Bilder, CSS und Fonts ohnehin - die Bytes werden hier
+        # mitgeschnitten statt später ein zweites Mal heruntergeladen
+        if capture_assets:
+            context.on('response', responses.append)
+
+        # Seite laden
+        await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+
+        # Auf Netzwerk warten
+        if wait_for_network:
+            try:
+                await page.wait_for_load_state('networkidle', timeout=10000)
+            except:
+                pass  # Timeout ist OK
+
+        # Cookie-Banner schließen
+        if close_cookie_banner:
+            cookie_selectors = [
+                # Borlabs Cookie
+                '.brlbs-btn-accept-all',
+                '.brlbs-cmpnt-btn-accept-all',
+                '[data-borlabs-cookie-accept]',
+                # Andere gängige Banner
+                '[class*="cookie"] button[class*="accept"]',
+                '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
+                '#onetrust-accept-btn-handler',
+                '.cc-accept-all',
+                '.cmplz-accept',
+                '#cookie-accept-all',
+                'button:has-text("Alle akzeptieren")',
+                'button:has-text("Accept all")',
+                'button:has-text("Akzeptieren")',
+                'button:has-text("Alle Cookies akzeptieren")',
+                '[data-testid="cookie-accept-all"]'
+            ]
+
+            for selector in cookie_selectors:
                 try:
-                    await page.wait_for_load_state('networkidle', timeout=10000)
+                    btn = page.locator(selector).first
+                    if await btn.is_visible(timeout=500):
+                        await btn.click()
+                        await page.wait_for_timeout(800)
+                        break
                 except:
-                    pass  # Timeout ist OK
-            
-            # Cookie-Banner schließen
-            if close_cookie_banner:
-                cookie_selectors = [
-                    # Borlabs Cookie
-                    '.brlbs-btn-accept-all',
-                    '.brlbs-cmpnt-btn-accept-all',
-                    '[data-borlabs-cookie-accept]',
-                    # Andere gängige Banner
-                    '[class*="cookie"] button[class*="accept"]',
-                    '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
-                    '#onetrust-accept-btn-handler',
-                    '.cc-accept-all',
-                    '.cmplz-accept',
-                    '#cookie-accept-all',
-                    'button:has-text("Alle akzeptieren")',
-                    'button:has-text("Accept all")',
-                    'button:has-text("Akzeptieren")',
-                    'button:has-text("Alle Cookies akzeptieren")',
-                    '[data-testid="cookie-accept-all"]'
-                ]
-
-                for selector in cookie_selectors:
-                    try:
-                        btn = page.locator(selector).first
-                        if await btn.is_visible(timeout=500):
-                            await btn.click()
-                            await page.wait_for_timeout(800)
-                            break
-                    except:
-                        continue
+                    continue
 
-            # Durch die Seite scrollen um Lazy-Loading zu triggern
+        # Durch die Seite scrollen um Lazy-Loading zu triggern
+        scroll_height = await page.evaluate('document.body.scrollHeight')
+        viewport_h = viewport_height
+        current_pos = 0
+
+        while current_pos < scroll_height:
+            current_pos += viewport_h
+            await page.evaluate(f'window.scrollTo(0, {current_pos})')
+            await page.wait_for_timeout(300)  # Warten auf Lazy-Load
+            # Scroll-Höhe kann sich ändern wenn Content nachgeladen wird
             scroll_height = await page.evaluate('document.body.scrollHeight')
-            viewport_h = viewport_height
-            current_pos = 0
 
-            while current_pos < scroll_height:
-                current_pos += viewport_h
-                await page.evaluate(f'window.scrollTo(0, {current_pos})')
-                await page.wait_for_timeout(300)  # Warten auf Lazy-Load
-                # Scroll-Höhe kann sich ändern wenn Content nachgeladen wird
-                scroll_height = await page.evaluate('document.body.scrollHeight')
+        # Zurück nach oben scrollen
+        await page.evaluate('window.scrollTo(0, 0)')
+        await page.wait_for_timeout(500)
 
-            # Zurück nach oben scrollen
-            await page.evaluate('window.scrollTo(0, 0)')
-            await page.wait_for_timeout(500)
+        # Auf Netzwerk warten nach dem Scrollen
+        try:
+            await page.wait_for_load_state('networkidle', timeout=5000)
+        except:
+            pass
+
+        # Cookie-Banner aus DOM entfernen (funktionieren ohne JS nicht)
+        if close_cookie_banner:
+            await page.evaluate('''() => {
+                const selectors = [
+                    // Borlabs Cookie
+                    '.brlbs-cmpnt-container',
+                    '#BorlabsCookieBox',
+                    '[class*="borlabs-cookie"]',
+                    // Cookiebot
+                    '#CybotCookiebotDialog',
+                    '#CybotCookiebotDialogBodyUnderlay',
+                    // OneTrust
+                    '#onetrust-consent-sdk',
+                    '#onetrust-banner-sdk',
+                    // Complianz
+                    '#cmplz-cookiebanner-container',
+                    '.cmplz-cookiebanner',
+                    // Cookie Notice
+                    '#cookie-notice',
+                    '#cookie-law-info-bar',
+                    // GDPR Cookie Compliance
+                    '#moove_gdpr_cookie_modal',
+                    '#moove_gdpr_cookie_info_bar',
+                    // Generic
+                    '[class*="cookie-banner"]',
+                    '[class*="cookie-consent"]',
+                    '[id*="cookie-banner"]',
+                    '[id*="cookie-consent"]'
+                ];
+                selectors.forEach(sel => {
+                    document.querySelectorAll(sel).forEach(el => el.remove());
+                });
+            }''')
+
+        # HTML extrahieren
+        html = await page.content()
+        final_url = page.url
+        assets = await collect_asset_cache(responses) if capture_assets else {}
 
-            # Auf Netzwerk warten nach dem Scrollen
-            try:
-                await page.wait_for_load_state('networkidle', timeout=5000)
-            except:
-                pass
-
-            # Cookie-Banner aus DOM entfernen (funktionieren ohne JS nicht)
-            if close_cookie_banner:
-                await page.evaluate('''() => {
-                    const selectors = [
-                        // Borlabs Cookie
-                        '.brlbs-cmpnt-container',
-                        '#BorlabsCookieBox',
-                        '[class*="borlabs-cookie"]',
-                        // Cookiebot
-                        '#CybotCookiebotDialog',
-                        '#CybotCookiebotDialogBodyUnderlay',
-                        // OneTrust
-                        '#onetrust-consent-sdk',
-                        '#onetrust-banner-sdk',
-                        // Complianz
-                        '#cmplz-cookiebanner-container',
-                        '.cmplz-cookiebanner',
-                        // Cookie Notice
-                        '#cookie-notice',
-                        '#cookie-law-info-bar',
-                        // GDPR Cookie Compliance
-                        '#moove_gdpr_cookie_modal',
-                        '#moove_gdpr_cookie_info_bar',
-                        // Generic
-                        '[class*="cookie-banner"]',
-                        '[class*="cookie-consent"]',
-                        '[id*="cookie-banner"]',
-                        '[id*="cookie-consent"]'
-                    ];
-                    selectors.forEach(sel => {
-                        document.querySelectorAll(sel).forEach(el => el.remove());
-                    });
-                }''')
-
-            # HTML extrahieren
-            html = await page.content()
-            final_url = page.url
-            
-            await browser.close()
-            
-            return {
-                'success': True,
-                'html': html,
-                'url': final_url
-            }
-            
-        except Exception as e:
-            await browser.close()
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return {
+            'success': True,
+            'html': html,
+            'url': final_url,
+            'assets': assets
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+    finally:
+        if context is not None:
+            await context.close()
+        if own_session:
+            await browser_session.close()
+
+
+def build_mhtml(html: str, base_url: str, resources: Dict[str, tuple]) -> bytes:
+    """
+    Packt HTML und Ressourcen in ein MHTML-Archiv (multipart/related), das
+    Chromium-Browser direkt öffnen. Die Ressourcen werden über ihre
+    Content-Location (absolute URL) aufgelöst.
+
+    Args:
+        resources: url -> (content, mime_type)
+    """
+    message = MIMEMultipart('related', type='text/html')
+    message['Snapshot-Content-Location'] = base_url
+    message['Subject'] = base_url
+    message['Date'] = formatdate(localtime=True)
+
+    # HTML als quoted-printable - bleibt im Archiv lesbar
+    charset = Charset('utf-8')
+    charset.body_encoding = QP
+    root = MIMENonMultipart('text', 'html')
+    root.set_payload(html, charset)
+    root['Content-Location'] = base_url
+    message.attach(root)
+
+    for url, (content, mime_type) in resources.items():
+        maintype, _, subtype = mime_type.split(';', 1)[0].strip().partition('/')
+        part = MIMEBase(maintype or 'application', subtype or 'octet-stream')
+        part.set_payload(content)
+        encoders.encode_base64(part)
+        part['Content-Location'] = url
+        message.attach(part)
+
+    return message.as_bytes(policy=policy.SMTP)
+
+
+def compress_output(data: bytes, output_path: str, compress: str) -> str:
+    """Schreibt eine komprimierte Kopie (.gz / .br) neben die HTML-Datei und gibt deren Pfad zurück."""
+    if compress == 'br':
+        # Quality 11 ist bei mehreren MB Base64 deutlich langsamer bei kaum besserer Rate
+        compressed = brotli.compress(data, quality=9)
+    elif ZLIB_NG_AVAILABLE:
+        compressed = gzip_ng.compress(data, compresslevel=6)
+    else:
+        compressed = gzip.compress(data, compresslevel=6)
+
+    compressed_path = f"{output_path}.{compress}"
+    write_file_bytes(compressed_path, compressed)
+    return compressed_path
+
+
+def default_output_path(url: str, assets_mode: str = 'embed', suffix: str = '') -> str:
+    """Erzeugt den Standard-Ausgabepfad {domain}_{timestamp}{suffix}_standalone.html (bzw. .mhtml)."""
+    domain = urlparse(url).netloc.replace('.', '_').replace(':', '_')
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    extension = 'mhtml' if assets_mode == 'mhtml' else 'html'
+    return f"{domain}_{timestamp}{suffix}_standalone.{extension}"
 
 
 async def url_to_standalone_html(
@@ -671,7 +1517,11 @@ async def url_to_standalone_html(
     include_watermark: bool = False,
     remove_scripts: bool = True,
     close_cookie_banner: bool = True,
-    assets_mode: str = 'embed'
+    assets_mode: str = 'embed',
+    browser_session: Optional[PlaywrightSession] = None,
+    session=None,
+    compress: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY
 ) -> Dict[str, Any]:
     """
     Hauptfunktion: Lädt URL und erstellt Standalone-HTML.
@@ -683,7 +1533,13 @@ async def url_to_standalone_html(
         include_watermark: Wasserzeichen einfügen
         remove_scripts: JavaScript entfernen
         close_cookie_banner: Cookie-Banner automatisch schließen
-        assets_mode: 'embed' (Base64), 'download' (Ordner), 'hotlink' (Original-URLs)
+        assets_mode: 'embed' (Base64), 'download' (Ordner), 'hotlink' (Original-URLs),
+            'mhtml' (ein MHTML-Archiv, siehe build_mhtml)
+        browser_session: Optionaler warmer Browser (siehe PlaywrightSession)
+        session: Optionale aiohttp-Session bzw. httpx-Client (siehe
+            create_fetch_session; sonst wird pro Aufruf eine geöffnet)
+        compress: 'gz' oder 'br' - zusätzlich eine komprimierte Kopie schreiben
+        concurrency: Maximal gleichzeitige Downloads der Ressourcen
 
     Returns:
         Dict mit 'success', 'output_path', 'html', 'stats', 'errors'
@@ -693,7 +1549,9 @@ async def url_to_standalone_html(
     # Seite mit Playwright laden
     result = await fetch_page_html(
         url,
-        close_cookie_banner=close_cookie_banner
+        close_cookie_banner=close_cookie_banner,
+        browser_session=browser_session,
+        capture_assets=assets_mode != 'hotlink'
     )
     
     if not result['success']:
@@ -705,50 +1563,282 @@ async def url_to_standalone_html(
     html = result['html']
     final_url = result['url']
     
-    print(f"✅ Seite geladen ({len(html)} Bytes)")
+    # Fortschritt immer mit URL - bei run_many laufen mehrere Seiten gleichzeitig
+    print(f"✅ Seite geladen: {url} ({len(html)} Bytes)")
 
     # Output-Pfad generieren falls nicht angegeben
     if not output_path:
-        parsed = urlparse(url)
-        domain = parsed.netloc.replace('.', '_').replace(':', '_')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_path = f"{domain}_{timestamp}_standalone.html"
+        output_path = default_output_path(url, assets_mode)
 
     # Assets-Ordner für download-Modus
     assets_folder = None
     if assets_mode == 'download':
         assets_folder = Path(output_path).stem + '_assets'
         Path(assets_folder).mkdir(exist_ok=True)
-        print(f"📁 Assets-Ordner: {assets_folder}/")
+        print(f"📁 Assets-Ordner für {url}: {assets_folder}/")
 
     if assets_mode == 'hotlink':
-        print(f"🔗 Hotlink-Modus: URLs bleiben unverändert")
+        print(f"🔗 Hotlink-Modus ({url}): URLs bleiben unverändert")
     else:
-        print(f"📦 Verarbeite Ressourcen ({assets_mode})...")
+        print(f"📦 Verarbeite Ressourcen ({assets_mode}): {url}")
 
-    # HTML zu Standalone konvertieren
-    standalone_result = create_standalone_html(
-        html=html,
-        base_url=final_url,
-        project_name=project_name,
-        include_watermark=include_watermark,
-        remove_scripts=remove_scripts,
-        assets_mode=assets_mode,
-        assets_folder=assets_folder
-    )
+    # HTML zu Standalone konvertieren - eine Session (aiohttp bzw. httpx) für
+    # HTML-Referenzen und CSS-url()-Ziele, im selben Event-Loop
+    own_session = session is None and assets_mode != 'hotlink'
+    if own_session:
+        session = create_fetch_session(concurrency)
+    try:
+        standalone_result = await create_standalone_html(
+            html=html,
+            base_url=final_url,
+            project_name=project_name,
+            include_watermark=include_watermark,
+            remove_scripts=remove_scripts,
+            max_workers=concurrency,
+            assets_mode=assets_mode,
+            assets_folder=assets_folder,
+            session=session,
+            resource_cache=result.get('assets')
+        )
+    finally:
+        if own_session and session is not None:
+            await close_fetch_session(session)
 
     # Speichern
-    Path(output_path).write_text(standalone_result['html'], encoding='utf-8')
-    
+    if assets_mode == 'mhtml':
+        html_bytes = build_mhtml(standalone_result['html'], final_url, standalone_result['resources'])
+    else:
+        html_bytes = standalone_result['html'].encode('utf-8')
+    write_file_bytes(output_path, html_bytes)
+
+    compressed_path = None
+    if compress:
+        compressed_path = compress_output(html_bytes, output_path, compress)
+        standalone_result['stats']['compressed_size'] = Path(compressed_path).stat().st_size
+
     return {
         'success': True,
         'output_path': output_path,
+        'compressed_path': compressed_path,
         'html': standalone_result['html'],
         'stats': standalone_result['stats'],
         'errors': standalone_result['errors']
     }
 
 
+# Parameter von url_to_standalone_html, die eine Server-Anfrage setzen darf
+SERVER_OPTIONS = (
+    'url', 'output_path', 'project_name', 'include_watermark',
+    'remove_scripts', 'close_cookie_banner', 'assets_mode', 'compress', 'concurrency'
+)
+
+# Erlaubte Werte - gelten für CLI und Server-Anfragen
+ASSETS_MODES = ('embed', 'download', 'hotlink', 'mhtml')
+COMPRESS_FORMATS = ('gz', 'br')
+
+
+async def run_one(
+    request_line: str,
+    defaults: Dict[str, Any],
+    browser_session: PlaywrightSession,
+    session=None
+) -> Dict[str, Any]:
+    """
+    Verarbeitet eine Server-Anfrage: eine URL oder ein JSON-Objekt mit 'url'
+    und optional weiteren SERVER_OPTIONS.
+    """
+    if request_line.startswith('{'):
+        try:
+            options = json.loads(request_line)
+        except ValueError as e:
+            return {'success': False, 'error': f'Ungültiges JSON: {e}'}
+    else:
+        options = {'url': request_line}
+
+    unknown = set(options) - set(SERVER_OPTIONS)
+    if unknown:
+        return {'success': False, 'error': f"Unbekannte Optionen: {', '.join(sorted(unknown))}"}
+    options = {**defaults, **options}
+
+    # Werte prüfen, bevor etwas geladen oder geschrieben wird;
+    # fehlende Werte übernehmen die Vorgaben von url_to_standalone_html
+    for name in ('url', 'output_path', 'project_name'):
+        value = options.get(name)
+        if value is not None and not isinstance(value, str):
+            return {'success': False, 'error': f"Ungültiges {name}: {value!r} (Text erwartet)"}
+    if not options.get('url'):
+        return {'success': False, 'error': 'Keine URL angegeben'}
+    # "false" als String wäre wahr - nur echte JSON-Booleans zulassen
+    for name in ('include_watermark', 'remove_scripts', 'close_cookie_banner'):
+        if name in options and not isinstance(options[name], bool):
+            return {'success': False, 'error': f"Ungültiges {name}: {options[name]!r} (true/false erwartet)"}
+    assets_mode = options.get('assets_mode', 'embed')
+    if assets_mode not in ASSETS_MODES:
+        return {'success': False, 'error': f"Ungültiger assets_mode: {assets_mode!r} (erlaubt: {', '.join(ASSETS_MODES)})"}
+    compress = options.get('compress')
+    if compress is not None and compress not in COMPRESS_FORMATS:
+        return {'success': False, 'error': f"Ungültiges compress: {compress!r} (erlaubt: {', '.join(COMPRESS_FORMATS)})"}
+    if compress == 'br' and not BROTLI_AVAILABLE:
+        return {'success': False, 'error': 'brotli nicht installiert (compress "br")'}
+    concurrency = options.get('concurrency', DEFAULT_CONCURRENCY)
+    if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1:
+        return {'success': False, 'error': f"Ungültiges concurrency: {concurrency!r} (Ganzzahl ab 1)"}
+
+    try:
+        result = await url_to_standalone_html(browser_session=browser_session, session=session, **options)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+    # Das HTML selbst liegt in der Ausgabedatei
+    result.pop('html', None)
+    return result
+
+
+async def serve(socket_path: str, defaults: Dict[str, Any]):
+    """
+    Server-Modus: Browser und HTTP-Session (aiohttp bzw. httpx) bleiben offen, URLs kommen
+    zeilenweise über einen Unix-Socket. Pro Zeile wird ein JSON-Objekt
+    (wie von url_to_standalone_html, ohne 'html') zurückgeschrieben.
+
+    Usage:
+        echo https://example.com | nc -U /tmp/url2standalone.sock
+    """
+    async with PlaywrightSession() as browser_session:
+        # Ohne Verbindungs-Obergrenze - pro Anfrage begrenzt concurrency die Downloads
+        session = create_fetch_session()
+
+        async def handle_client(reader, writer):
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    request_line = line.decode('utf-8', errors='replace').strip()
+                    if not request_line:
+                        continue
+                    response = await run_one(request_line, defaults, browser_session, session)
+                    writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                    await writer.drain()
+            finally:
+                writer.close()
+
+        bound = False
+        try:
+            server = await asyncio.start_unix_server(handle_client, path=socket_path)
+            bound = True
+            print(f"🔌 Server läuft auf {socket_path} (Strg+C zum Beenden)")
+            async with server:
+                await server.serve_forever()
+        finally:
+            if session is not None:
+                await close_fetch_session(session)
+            # Nur den eigenen Socket entfernen - ist das Binden gescheitert (z.B. weil
+            # dort eine normale Datei liegt), bleibt der Pfad unangetastet
+            if bound:
+                try:
+                    if stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                        os.unlink(socket_path)
+                except FileNotFoundError:
+                    pass
+
+
+# Maximal gleichzeitig verarbeitete Seiten (--jobs)
+DEFAULT_JOBS = 4
+
+
+async def run_many(
+    urls: List[str],
+    options: Dict[str, Any],
+    output_path: Optional[str] = None,
+    jobs: int = DEFAULT_JOBS
+) -> List[Dict[str, Any]]:
+    """
+    Verarbeitet mehrere URLs parallel in einem Event-Loop. Browser und
+    HTTP-Session (aiohttp bzw. httpx) werden nur einmal gestartet und geteilt, die
+    Asset-Downloads der einzelnen Seiten laufen verzahnt.
+
+    Args:
+        urls: Die zu ladenden URLs
+        options: Weitere Parameter für url_to_standalone_html (siehe SERVER_OPTIONS)
+        output_path: Ausgabepfad, nur bei genau einer URL
+        jobs: Maximal gleichzeitig verarbeitete Seiten
+
+    Returns:
+        Ein Ergebnis pro URL in derselben Reihenfolge wie urls
+    """
+    # Gleiche Domain in derselben Sekunde ergäbe denselben Standard-Dateinamen
+    domains = [urlparse(url).netloc for url in urls]
+    output_paths: List[Optional[str]] = []
+    for index, (url, domain) in enumerate(zip(urls, domains), 1):
+        if len(urls) == 1:
+            output_paths.append(output_path)
+        elif domains.count(domain) > 1:
+            output_paths.append(default_output_path(url, options.get('assets_mode', 'embed'), f"_{index}"))
+        else:
+            output_paths.append(None)
+
+    semaphore = asyncio.Semaphore(jobs)
+
+    async with PlaywrightSession() as browser_session:
+        # Bis zu jobs Seiten laden gleichzeitig, jede mit bis zu concurrency Downloads
+        use_session = options.get('assets_mode') != 'hotlink'
+        max_connections = options.get('concurrency', DEFAULT_CONCURRENCY) * jobs
+        session = create_fetch_session(max_connections) if use_session else None
+
+        async def convert(url, path):
+            async with semaphore:
+                return await url_to_standalone_html(
+                    url,
+                    output_path=path,
+                    browser_session=browser_session,
+                    session=session,
+                    **options
+                )
+
+        try:
+            results = await asyncio.gather(
+                *(convert(url, path) for url, path in zip(urls, output_paths)),
+                return_exceptions=True
+            )
+        finally:
+            if session is not None:
+                await close_fetch_session(session)
+
+    # Eine fehlgeschlagene Seite bricht die übrigen nicht ab
+    return [
+        {'success': False, 'error': str(result)} if isinstance(result, BaseException) else result
+        for result in results
+    ]
+
+
+def write_stderr(parts: List[str]):
+    """
+    Schreibt mehrere Textteile mit writev() nach stderr, damit sie nicht mit
+    anderer Ausgabe verzahnt werden. Ohne echten Dateideskriptor (pytest,
+    IDLE, StringIO) wird normal über sys.stderr geschrieben.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        fd = sys.stderr.fileno()
+    except (AttributeError, OSError, ValueError):
+        fd = -1
+    if fd < 0 or not hasattr(os, 'writev'):
+        sys.stderr.write(''.join(parts))
+        return
+
+    encoding = sys.stderr.encoding or 'utf-8'
+    buffers = [memoryview(part.encode(encoding, errors='replace')) for part in parts]
+    while buffers:
+        # writev kann weniger als angefordert schreiben - den Rest erneut schicken
+        written = os.writev(fd, buffers)
+        while buffers and written >= len(buffers[0]):
+            written -= len(buffers[0])
+            buffers.pop(0)
+        if written:
+            buffers[0] = buffers[0][written:]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Lädt eine URL und erstellt eine standalone HTML-Datei mit eingebetteten Ressourcen",
@@ -757,13 +1847,19 @@ def main():
 Beispiele:
   python url_to_standalone.py https://example.com
   python url_to_standalone.py https://example.com preview.html
+  python url_to_standalone.py https://example.com https://example.org --jobs 2
   python url_to_standalone.py https://example.com --assets-mode download
   python url_to_standalone.py https://example.com --assets-mode hotlink
+  python url_to_standalone.py https://example.com --assets-mode mhtml
   python url_to_standalone.py https://example.com --watermark --project-name "Kunde X"
+  python url_to_standalone.py --server /tmp/url2standalone.sock
         """
     )
-    parser.add_argument("url", help="Die zu ladende URL")
-    parser.add_argument("output", nargs='?', help="Ausgabe HTML-Datei (optional)")
+    parser.add_argument(
+        "url",
+        nargs='*',
+        help="Die zu ladende(n) URL(s); bei einer URL optional gefolgt von der Ausgabe HTML-Datei"
+    )
     parser.add_argument(
         "--project-name", "-p",
         default="Preview",
@@ -786,12 +1882,53 @@ Beispiele:
     )
     parser.add_argument(
         "--assets-mode", "-a",
-        choices=['embed', 'download', 'hotlink'],
+        choices=ASSETS_MODES,
         default='embed',
-        help="Asset-Behandlung: embed=Base64 einbetten (default), download=in Ordner speichern, hotlink=Original-URLs"
+        help="Asset-Behandlung: embed=Base64 einbetten (default), download=in Ordner speichern, hotlink=Original-URLs, mhtml=ein MHTML-Archiv"
+    )
+    parser.add_argument(
+        "--server",
+        metavar="SOCKET",
+        help="Server-Modus: Browser offen halten und URLs zeilenweise über diesen Unix-Socket annehmen"
+    )
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximal gleichzeitige Downloads der Ressourcen (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESS_FORMATS,
+        help="Zusätzlich eine komprimierte Kopie schreiben (.html.gz bzw. .html.br)"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Maximal gleichzeitig verarbeitete URLs (default: {DEFAULT_JOBS})"
     )
 
     args = parser.parse_args()
+
+    # Letztes Argument ohne Schema ist die Ausgabedatei (wie bisher: URL [OUTPUT])
+    urls = args.url
+    output = None
+    if len(urls) > 1 and '://' not in urls[-1]:
+        output = urls.pop()
+        if len(urls) > 1:
+            parser.error("Ausgabedatei nur bei einer URL möglich")
+
+    if not urls and not args.server:
+        parser.error("URL oder --server SOCKET angeben")
+    if urls and args.server:
+        parser.error("--server nimmt keine URLs an - sie kommen über den Socket")
+    if args.concurrency < 1:
+        parser.error("--concurrency muss mindestens 1 sein")
+    if args.jobs < 1:
+        parser.error("--jobs muss mindestens 1 sein")
+    if args.server and not hasattr(asyncio, 'start_unix_server'):
+        parser.error("--server benötigt Unix-Sockets (nicht unter Windows verfügbar)")
     
     # Abhängigkeiten prüfen
     if not PLAYWRIGHT_AVAILABLE:
@@ -799,44 +1936,94 @@ Beispiele:
         print("   Installieren mit: pip install playwright && playwright install chromium")
         sys.exit(1)
     
-    if not REQUESTS_AVAILABLE:
-        print("⚠️  requests nicht installiert - Ressourcen werden nicht eingebettet")
-        print("   Installieren mit: pip install requests")
-    
-    # Ausführen
-    result = asyncio.run(url_to_standalone_html(
-        url=args.url,
-        output_path=args.output,
-        project_name=args.project_name,
-        include_watermark=args.watermark,
-        remove_scripts=not args.keep_scripts,
-        close_cookie_banner=not args.no_cookie_close,
-        assets_mode=args.assets_mode
-    ))
-    
-    if not result['success']:
-        print(f"❌ Fehler: {result.get('error')}")
+    if not REQUESTS_AVAILABLE and not AIOHTTP_AVAILABLE and not HTTPX_AVAILABLE:
+        print("⚠️  Weder requests, aiohttp noch httpx installiert - Ressourcen werden nicht eingebettet")
+        print("   Installieren mit: pip install requests aiohttp")
+
+    if args.compress == 'br' and not BROTLI_AVAILABLE:
+        print("❌ brotli nicht installiert!")
+        print("   Installieren mit: pip install brotli")
+        sys.exit(1)
+
+    # libuv-basierter Event-Loop - weniger Overhead bei vielen parallelen Downloads
+    if UVLOOP_AVAILABLE and sys.platform != 'win32':
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    # CLI-Optionen gelten für jede URL bzw. als Vorgabe für jede Server-Anfrage
+    options = {
+        'project_name': args.project_name,
+        'include_watermark': args.watermark,
+        'remove_scripts': not args.keep_scripts,
+        'close_cookie_banner': not args.no_cookie_close,
+        'assets_mode': args.assets_mode,
+        'compress': args.compress,
+        'concurrency': args.concurrency
+    }
+
+    if args.server:
+        try:
+            asyncio.run(serve(args.server, options))
+        except KeyboardInterrupt:
+            print("\n👋 Server beendet")
+        return
+
+    # Ausführen - alle URLs in einem Event-Loop mit einem Browser
+    results = asyncio.run(run_many(urls, options, output_path=output, jobs=args.jobs))
+
+    # Statistiken sammeln und in einem Rutsch ausgeben
+    lines = []
+    report = []
+    add = lines.append
+    failed = 0
+    for url, result in zip(urls, results):
+        if not result['success']:
+            failed += 1
+            add(f"\n❌ Fehler ({url}): {result.get('error')}" if len(urls) > 1 else f"❌ Fehler: {result.get('error')}")
+            continue
+
+        stats = result['stats']
+        errors = result['errors']
+        compressed_path = result['compressed_path']
+        add(f"\n✅ HTML erstellt: {result['output_path']}")
+        if args.assets_mode == 'embed':
+            add(f"   📊 Stylesheets eingebettet: {stats['stylesheets_inlined']}")
+            add(f"   🖼️  Bilder eingebettet: {stats['images_inlined']}")
+            add(f"   ♻️  Duplikate (gleicher Inhalt): {stats['assets_deduped']}")
+            add(f"   ⚡ Base64-Codec: {stats['base64_codec']}")
+        elif args.assets_mode == 'download':
+            add(f"   📁 Assets heruntergeladen: {stats['assets_downloaded']}")
+        elif args.assets_mode == 'mhtml':
+            add(f"   🗂️  Assets im MHTML-Archiv: {stats['assets_bundled']}")
+        else:
+            add("   🔗 Assets: Original-URLs beibehalten")
+        if stats['assets_skipped_inline']:
+            add(f"   ⏭️  Bereits eingebettet/übersprungen: {stats['assets_skipped_inline']}")
+        add(f"   📦 Größe vorher: {stats['total_size_before'] / 1024:.1f} KB")
+        add(f"   📦 Größe nachher: {stats['total_size_after'] / 1024:.1f} KB")
+        if compressed_path:
+            add(f"   🗜️  Komprimiert: {stats['compressed_size'] / 1024:.1f} KB ({compressed_path})")
+
+        # Ein Block pro URL - hält die Anzahl der writev()-Puffer klein
+        if errors:
+            error_count = len(errors)
+            source = f" ({url})" if len(urls) > 1 else ""
+            block = [f"\n⚠️  {error_count} Ressourcen nicht geladen{source}:\n"]
+            block.extend(f"   - {error}\n" for error in errors[:5])
+            if error_count > 5:
+                block.append(f"   ... und {error_count - 5} weitere\n")
+            report.append(''.join(block))
+
+    if len(urls) > 1:
+        add(f"\n🏁 {len(urls) - failed} von {len(urls)} URLs erfolgreich")
+
+    sys.stdout.write('\n'.join(lines) + '\n')
+
+    # Fehlerliste nach stderr - nicht mit anderer Ausgabe verzahnt
+    if report:
+        write_stderr(report)
+
+    if failed:
         sys.exit(1)
-    
-    # Statistiken ausgeben
-    stats = result['stats']
-    print(f"\n✅ HTML erstellt: {result['output_path']}")
-    if args.assets_mode == 'embed':
-        print(f"   📊 Stylesheets eingebettet: {stats['stylesheets_inlined']}")
-        print(f"   🖼️  Bilder eingebettet: {stats['images_inlined']}")
-    elif args.assets_mode == 'download':
-        print(f"   📁 Assets heruntergeladen: {stats['assets_downloaded']}")
-    elif args.assets_mode == 'hotlink':
-        print(f"   🔗 Assets: Original-URLs beibehalten")
-    print(f"   📦 Größe vorher: {stats['total_size_before'] / 1024:.1f} KB")
-    print(f"   📦 Größe nachher: {stats['total_size_after'] / 1024:.1f} KB")
-    
-    if result['errors']:
-        print(f"\n⚠️  {len(result['errors'])} Ressourcen nicht geladen:")
-        for error in result['errors'][:5]:
-            print(f"   - {error}")
-        if len(result['errors']) > 5:
-            print(f"   ... und {len(result['errors']) - 5} weitere")
 
 
 if __name__ == "__main__":